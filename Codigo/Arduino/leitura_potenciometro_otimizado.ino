@@ -24,6 +24,10 @@ int vx, vy;
 unsigned long lastTime = 0;
 const unsigned long INTERVAL = 10;
 
+// Contador de frames e instante da leitura, para o host medir perdas e atraso
+unsigned long frameSeq = 0;
+unsigned long sampleTime = 0;
+
 // Função que le o canal do multiplexador
 int readMux(int channel) {
   // Seleciona o canal no multiplexer
@@ -65,6 +69,7 @@ void loop() {
   
   if (currentTime - lastTime >= INTERVAL) {
     lastTime = currentTime;
+    sampleTime = micros();
     
     // Le os valores dos dedos
     int valorD0 = readMux(D0_CHANNEL);  // D0 via canal 0 do multiplexer
@@ -93,6 +98,12 @@ void loop() {
     Serial.print(" X:");
     Serial.print(vx);
     Serial.print(" Y:");
-    Serial.println(vy);
+    Serial.print(vy);
+    Serial.print(" S:");
+    Serial.print(frameSeq);
+    Serial.print(" T:");
+    Serial.println(sampleTime);
+    
+    frameSeq++;
   }
 }
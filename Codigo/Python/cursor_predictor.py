@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+
+from link_stats import WRAP
+
+
+MODEL_CV = "cv"  # Velocidade constante
+MODEL_CA = "ca"  # Aceleração constante
+
+PREDICTOR_DEFAULTS = {
+    "enabled": False,
+    "model": MODEL_CV,
+    "aggressiveness": 1.0,  # Fração do atraso estimado que será compensada
+    "max_lead": 40.0,       # Maior adiantamento permitido, em pixels
+    "extra_latency_ms": 8.0,  # Atraso fixo não medido (USB + injeção do cursor)
+    "max_horizon_intervals": 4,  # Teto do horizonte final (já com aggressiveness), em intervalos
+}
+
+
+NUMERIC_KEYS = ("aggressiveness", "max_lead", "extra_latency_ms", "max_horizon_intervals")
+
+
+def load_predictor_config(config):
+    """Completa com os padrões e converte os valores numéricos do configs.glv.
+
+    Lança ValueError se o modelo for desconhecido ou um valor não for número.
+    """
+    config = {**PREDICTOR_DEFAULTS, **(config or {})}
+    if config["model"] not in (MODEL_CV, MODEL_CA):
+        raise ValueError(f"Modelo desconhecido: {config['model']!r} (use '{MODEL_CV}' ou '{MODEL_CA}')")
+    for key in NUMERIC_KEYS:
+        try:
+            config[key] = float(config[key])
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor inválido para '{key}': {config[key]!r}")
+    return config
+
+
+def pipeline_latency(interval_s, measured_latency_s, config):
+    """Atraso estimado do pipeline: um intervalo + atraso medido + atraso fixo."""
+    config = {**PREDICTOR_DEFAULTS, **(config or {})}
+    return interval_s + max(0.0, measured_latency_s) + config["extra_latency_ms"] / 1000
+
+
+def prediction_horizon(latency_s, interval_s, config):
+    """Quanto extrapolar: aggressiveness * latência, com teto.
+
+    O teto vale para o horizonte final e impede que um pico no atraso medido
+    (ou uma aggressiveness alta) faça o cursor extrapolar centenas de ms.
+    """
+    config = {**PREDICTOR_DEFAULTS, **(config or {})}
+    horizon = max(0.0, config["aggressiveness"] * latency_s)
+    return min(horizon, config["max_horizon_intervals"] * interval_s)
+
+
+def frame_interval(previous, frame, default):
+    """Intervalo entre dois frames em segundos, pelo relógio do Arduino se houver."""
+    if previous is None:
+        return default
+    if previous.device_time is not None and frame.device_time is not None:
+        dt = ((frame.device_time - previous.device_time) % WRAP) / 1e6
+    else:
+        dt = frame.timestamp - previous.timestamp
+    return dt if 0 < dt <= 10 * default else default
+
+
+def _matmul(a, b):
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))] for i in range(len(a))]
+
+
+def _transpose(a):
+    return [list(linha) for linha in zip(*a)]
+
+
+class KalmanAxis:
+    """Filtro de Kalman de um eixo, medindo apenas a posição.
+
+    O ruído de processo é o de aceleração branca (cv) ou jerk branco (ca).
+    """
+
+    def __init__(self, model=MODEL_CV, process_noise=4e6, measurement_noise=1.0):
+        if model not in (MODEL_CV, MODEL_CA):
+            raise ValueError(f"Modelo desconhecido: {model}")
+
+        self.model = model
+        self.n = 2 if model == MODEL_CV else 3
+        self.q = process_noise
+        self.r = measurement_noise
+        self.x = None
+        self.P = None
+
+    def _transition(self, dt):
+        if self.n == 2:
+            F = [[1.0, dt], [0.0, 1.0]]
+            G = [dt * dt / 2, dt]
+        else:
+            F = [[1.0, dt, dt * dt / 2], [0.0, 1.0, dt], [0.0, 0.0, 1.0]]
+            G = [dt ** 3 / 6, dt * dt / 2, dt]
+        Q = [[self.q * gi * gj for gj in G] for gi in G]
+        return F, Q
+
+    def update(self, position, dt):
+        if self.x is None:
+            self.x = [position] + [0.0] * (self.n - 1)
+            self.P = [[self.r if i == j == 0 else (1e6 if i == j else 0.0) for j in range(self.n)]
+                      for i in range(self.n)]
+            return
+
+        F, Q = self._transition(dt)
+        x = [sum(F[i][k] * self.x[k] for k in range(self.n)) for i in range(self.n)]
+        P = _matmul(_matmul(F, self.P), _transpose(F))
+        P = [[P[i][j] + Q[i][j] for j in range(self.n)] for i in range(self.n)]
+
+        # H = [1, 0, ...]: a inovação e o ganho saem direto da primeira coluna
+        s = P[0][0] + self.r
+        K = [P[i][0] / s for i in range(self.n)]
+        inovacao = position - x[0]
+
+        self.x = [x[i] + K[i] * inovacao for i in range(self.n)]
+        self.P = [[P[i][j] - K[i] * P[0][j] for j in range(self.n)] for i in range(self.n)]
+
+    def extrapolate(self, horizon):
+        if self.x is None:
+            return 0.0
+        position = self.x[0] + self.x[1] * horizon
+        if self.n == 3:
+            position += self.x[2] * horizon * horizon / 2
+        return position
+
+
+class CursorPredictor:
+    """Adianta o cursor pelo atraso do pipeline.
+
+    Recebe os deslocamentos já convertidos para pixels, acompanha a posição
+    "real" do cursor e devolve deslocamentos inteiros que levam o cursor à
+    posição prevista daqui a horizon_s (ver prediction_horizon). O adiantamento só
+    cresce enquanto a mão continua indo na mesma direção e nunca passa de
+    max_lead, o que limita o overshoot quando o movimento para ou inverte.
+    """
+
+    def __init__(self, model=MODEL_CV, max_lead=40.0, process_noise=None, measurement_noise=1.0):
+        if process_noise is None:
+            process_noise = 4e6 if model == MODEL_CV else 4e8
+        self.max_lead = max_lead
+        self.axes = [KalmanAxis(model, process_noise, measurement_noise) for _ in range(2)]
+
+        self.raw = [0.0, 0.0]      # Posição sem previsão
+        self.lead = [0.0, 0.0]     # Adiantamento aplicado
+        self.emitted = [0, 0]      # Posição já enviada ao sistema (pixels inteiros)
+
+    @classmethod
+    def from_config(cls, config):
+        config = load_predictor_config(config)
+        return cls(config["model"], config["max_lead"])
+
+    def predict(self, dx, dy, dt, horizon_s):
+        """Retorna (lead_x, lead_y) em pixels sem mover o cursor."""
+        horizon = max(0.0, horizon_s)
+        deltas = (dx, dy)
+
+        lead = []
+        for i, axis in enumerate(self.axes):
+            self.raw[i] += deltas[i]
+            axis.update(self.raw[i], dt)
+            valor = axis.extrapolate(horizon) - self.raw[i]
+
+            # Mão parada ou invertendo: o adiantamento só pode encolher
+            if deltas[i] * valor <= 0:
+                limite = abs(self.lead[i]) / 2
+                valor = max(-limite, min(limite, valor))
+            lead.append(valor)
+
+        norma = math.hypot(lead[0], lead[1])
+        if norma > self.max_lead:
+            lead = [valor * self.max_lead / norma for valor in lead]
+
+        self.lead = lead
+        return lead[0], lead[1]
+
+    def update(self, dx, dy, dt, horizon_s):
+        """Retorna o deslocamento inteiro (dx, dy) a ser injetado."""
+        lead = self.predict(dx, dy, dt, horizon_s)
+
+        move = []
+        for i in range(2):
+            alvo = int(round(self.raw[i] + lead[i]))
+            move.append(alvo - self.emitted[i])
+            self.emitted[i] = alvo
+        return move[0], move[1]
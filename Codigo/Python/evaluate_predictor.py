@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Avalia o CursorPredictor offline numa sessão gravada.
+
+Reconstrói o caminho do cursor sem previsão e compara, a cada frame, a
+posição mostrada com onde a mão já estava "latência" segundos depois.
+Também estima quanto atraso a previsão recuperou (o deslocamento no tempo
+que melhor alinha o cursor mostrado ao caminho real).
+
+    python evaluate_predictor.py sessao.jsonl --model ca --aggressiveness 0.8
+"""
+
+import argparse
+import bisect
+import math
+
+from cursor_predictor import (
+    CursorPredictor, PREDICTOR_DEFAULTS, MODEL_CV, MODEL_CA, frame_interval, pipeline_latency,
+    prediction_horizon,
+)
+from link_stats import LinkStats
+from session_recorder import load_session
+
+
+def interpolate(times, points, t):
+    i = bisect.bisect_left(times, t)
+    if i <= 0:
+        return points[0]
+    if i >= len(times):
+        return points[-1]
+    t0, t1 = times[i - 1], times[i]
+    w = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+    (x0, y0), (x1, y1) = points[i - 1], points[i]
+    return x0 + w * (x1 - x0), y0 + w * (y1 - y0)
+
+
+def replay(frames, config, sensitivity, interval_s, latency_s=None):
+    """Passa a sessão pelo preditor como o ArduinoThread faria.
+
+    Retorna (tempos, caminho sem previsão, caminho mostrado, latência média estimada).
+    """
+    predictor = CursorPredictor.from_config(config)
+    stats = LinkStats(interval_s=interval_s)
+
+    times, raw, shown, latencies = [], [], [], []
+    t = 0.0
+    previous = None
+    for frame in frames:
+        stats.update(frame.device_seq, frame.device_time, frame.timestamp)
+        if frame.x is None or frame.y is None:
+            continue
+
+        dt = frame_interval(previous, frame, interval_s)
+        t += dt if previous is not None else 0.0
+        previous = frame
+
+        latency = latency_s
+        if latency is None:
+            latency = pipeline_latency(interval_s, stats.mean_latency(), config)
+        latencies.append(latency)
+
+        horizon = prediction_horizon(latency, interval_s, config)
+        predictor.update(frame.y * sensitivity, -frame.x * sensitivity, dt, horizon)
+        times.append(t)
+        raw.append(tuple(predictor.raw))
+        shown.append(tuple(predictor.emitted))
+
+    mean_latency = sum(latencies) / len(latencies) if latencies else 0.0
+    return times, raw, shown, mean_latency
+
+
+def errors(times, raw, shown, horizon):
+    """Distâncias entre o cursor mostrado e a posição real horizon depois."""
+    fim = times[-1] - horizon
+    resultado = []
+    for t, ponto in zip(times, shown):
+        if t > fim:
+            break
+        alvo = interpolate(times, raw, t + horizon)
+        resultado.append(math.hypot(ponto[0] - alvo[0], ponto[1] - alvo[1]))
+    return resultado
+
+
+def rms(valores):
+    return math.sqrt(sum(v * v for v in valores) / len(valores)) if valores else 0.0
+
+
+def best_lead(times, raw, shown, max_lead_s, step_s=0.001):
+    """Deslocamento no tempo (s) que melhor alinha o cursor mostrado ao caminho real."""
+    passos = int(max_lead_s / step_s) + 1
+    return min((rms(errors(times, raw, shown, k * step_s)), k * step_s) for k in range(passos))[1]
+
+
+def evaluate(frames, config, sensitivity=0.8, interval_s=0.010, latency_s=None):
+    times, raw, shown, horizon = replay(frames, config, sensitivity, interval_s, latency_s)
+    if len(times) < 2:
+        raise ValueError("Sessão sem frames de movimento suficientes")
+
+    base = errors(times, raw, raw, horizon)
+    pred = errors(times, raw, shown, horizon)
+    return {
+        "frames": len(times),
+        "latency_ms": horizon * 1000,
+        "baseline_rms_px": rms(base),
+        "baseline_max_px": max(base, default=0.0),
+        "predicted_rms_px": rms(pred),
+        "predicted_max_px": max(pred, default=0.0),
+        "latency_saved_ms": best_lead(times, raw, shown, 2 * horizon) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação offline do preditor de cursor")
+    parser.add_argument("session", help="arquivo gravado pelo SessionRecorder")
+    parser.add_argument("--model", choices=[MODEL_CV, MODEL_CA, "all"], default="all")
+    parser.add_argument("--aggressiveness", type=float, default=PREDICTOR_DEFAULTS["aggressiveness"])
+    parser.add_argument("--max-lead", type=float, default=PREDICTOR_DEFAULTS["max_lead"])
+    parser.add_argument("--extra-latency-ms", type=float, default=PREDICTOR_DEFAULTS["extra_latency_ms"])
+    parser.add_argument("--max-horizon-intervals", type=float,
+                        default=PREDICTOR_DEFAULTS["max_horizon_intervals"])
+    parser.add_argument("--latency-ms", type=float, default=None,
+                        help="atraso fixo a compensar (padrão: medido na sessão, como no app)")
+    parser.add_argument("--sensitivity", type=float, default=0.8)
+    args = parser.parse_args()
+
+    frames = load_session(args.session)
+    latency_s = args.latency_ms / 1000 if args.latency_ms is not None else None
+    models = [MODEL_CV, MODEL_CA] if args.model == "all" else [args.model]
+
+    for model in models:
+        config = {
+            **PREDICTOR_DEFAULTS,
+            "enabled": True,
+            "model": model,
+            "aggressiveness": args.aggressiveness,
+            "max_lead": args.max_lead,
+            "extra_latency_ms": args.extra_latency_ms,
+            "max_horizon_intervals": args.max_horizon_intervals,
+        }
+        resultado = evaluate(frames, config, args.sensitivity, latency_s=latency_s)
+
+        print(f"Modelo {model} ({resultado['frames']} frames, atraso {resultado['latency_ms']:.1f} ms)")
+        print(f"  Erro sem previsão: RMS {resultado['baseline_rms_px']:.2f} px, "
+              f"máx {resultado['baseline_max_px']:.2f} px")
+        print(f"  Erro com previsão: RMS {resultado['predicted_rms_px']:.2f} px, "
+              f"máx {resultado['predicted_max_px']:.2f} px")
+        print(f"  Atraso recuperado: {resultado['latency_saved_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
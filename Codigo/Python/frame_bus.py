@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+
+POLICY_EVERY = "every"        # Recebe todos os frames, em ordem
+POLICY_LATEST = "latest"      # Recebe apenas o frame mais recente
+POLICY_DECIMATE = "decimate"  # Recebe o frame mais recente no máximo N vezes por segundo
+
+MISSING = -(2 ** 31)  # Marca campo ausente nos arrays do buffer
+INT_MAX = 2 ** 31 - 1     # Limite do array("i") de dedos e movimento
+DEVICE_MAX = 2 ** 32 - 1  # S e T são unsigned long no Arduino
+DEVICE_TAGS = ("S", "T")
+
+Frame = namedtuple("Frame", ["seq", "timestamp", "fingers", "x", "y", "device_seq", "device_time"])
+
+
+def parse_line(linha, finger_tags):
+    """Converte uma linha 'D0:512 ... X:1 Y:-2 S:7 T:70012' em
+    (fingers, x, y, device_seq, device_time).
+
+    S é o contador de frames do Arduino e T o micros() da leitura.
+    Campos ausentes, inválidos ou fora da faixa do buffer viram None.
+    """
+    campos = {}
+    for token in linha.split():
+        tag, sep, valor = token.partition(":")
+        if not sep:
+            continue
+        try:
+            valor = int(valor)
+        except ValueError:
+            continue
+
+        if tag in DEVICE_TAGS:
+            valido = 0 <= valor <= DEVICE_MAX
+        else:
+            valido = MISSING < valor <= INT_MAX
+        if valido:
+            campos[tag] = valor
+
+    fingers = tuple(campos.get(tag) for tag in finger_tags)
+    return fingers, campos.get("X"), campos.get("Y"), campos.get("S"), campos.get("T")
+
+
+class Subscription:
+    """Cursor independente de um consumidor sobre o FrameBus."""
+
+    def __init__(self, bus, name, policy=POLICY_EVERY, rate_hz=None):
+        if policy not in (POLICY_EVERY, POLICY_LATEST, POLICY_DECIMATE):
+            raise ValueError(f"Política desconhecida: {policy}")
+        if policy == POLICY_DECIMATE and not rate_hz:
+            raise ValueError("Política 'decimate' exige rate_hz")
+
+        self.bus = bus
+        self.name = name
+        self.policy = policy
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.cursor = bus.head
+        self.closed = False
+
+        self.delivered = 0
+        self.dropped = 0   # Frames sobrescritos antes de serem lidos
+        self.skipped = 0   # Frames descartados de propósito pela política
+        self.max_lag = 0
+        self._last_timestamp = None
+
+    @property
+    def lag(self):
+        return self.bus.head - self.cursor
+
+    def poll(self):
+        """Retorna os frames pendentes segundo a política, sem bloquear."""
+        with self.bus._cond:
+            return self._poll_locked()
+
+    def wait(self, timeout=None):
+        """Espera por um frame novo (ou fechamento) e retorna os pendentes."""
+        with self.bus._cond:
+            if not self.closed and self.cursor >= self.bus._next_seq:
+                self.bus._cond.wait(timeout)
+            return self._poll_locked()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+        }
+
+    def _poll_locked(self):
+        bus = self.bus
+        head = bus._next_seq
+        if self.closed or self.cursor >= head:
+            return []
+
+        pending = head - self.cursor
+        self.max_lag = max(self.max_lag, pending)
+
+        if self.policy == POLICY_EVERY:
+            oldest = max(0, head - bus.capacity)
+            if self.cursor < oldest:
+                self.dropped += oldest - self.cursor
+                self.cursor = oldest
+            frames = [bus._read(seq) for seq in range(self.cursor, head)]
+            self.cursor = head
+            self.delivered += len(frames)
+            return frames
+
+        # latest / decimate: só interessa o último frame escrito
+        self.cursor = head
+        latest = bus._read(head - 1)
+        if (self.policy == POLICY_DECIMATE and self._last_timestamp is not None
+                and latest.timestamp - self._last_timestamp < self.period):
+            self.skipped += pending
+            return []
+
+        self._last_timestamp = latest.timestamp
+        self.skipped += pending - 1
+        self.delivered += 1
+        return [latest]
+
+
+class FrameBus:
+    """Ring buffer de frames com um produtor e vários consumidores.
+
+    Os frames ficam guardados em arrays pré-alocados; cada consumidor lê com
+    seu próprio cursor, então um consumidor lento perde frames antigos em vez
+    de segurar o produtor.
+    """
+
+    def __init__(self, capacity=256, n_fingers=5):
+        self.capacity = capacity
+        self.n_fingers = n_fingers
+        self._cond = threading.Condition(threading.Lock())
+        self._next_seq = 0
+        self._subscriptions = []
+
+        self._timestamp = array("d", [0.0] * capacity)
+        self._fingers = array("i", [MISSING] * (capacity * n_fingers))
+        self._motion = array("i", [MISSING] * (capacity * 2))
+        self._device = array("q", [MISSING] * (capacity * 2))  # S e T do Arduino
+
+    @property
+    def head(self):
+        """Número de sequência do próximo frame a ser publicado."""
+        return self._next_seq
+
+    def publish(self, fingers, x=None, y=None, timestamp=None, device_seq=None, device_time=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._cond:
+            seq = self._next_seq
+            slot = seq % self.capacity
+            self._timestamp[slot] = timestamp
+
+            base = slot * self.n_fingers
+            for i in range(self.n_fingers):
+                valor = fingers[i] if i < len(fingers) else None
+                self._fingers[base + i] = MISSING if valor is None else valor
+
+            self._motion[2 * slot] = MISSING if x is None else x
+            self._motion[2 * slot + 1] = MISSING if y is None else y
+            self._device[2 * slot] = MISSING if device_seq is None else device_seq
+            self._device[2 * slot + 1] = MISSING if device_time is None else device_time
+
+            self._next_seq = seq + 1
+            self._cond.notify_all()
+        return seq
+
+    def subscribe(self, name, policy=POLICY_EVERY, rate_hz=None):
+        subscription = Subscription(self, name, policy, rate_hz)
+        with self._cond:
+            subscription.cursor = self._next_seq
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            subscription.closed = True
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Estatísticas de atraso e perdas de cada consumidor, por nome."""
+        with self._cond:
+            return {sub.name: sub.stats() for sub in self._subscriptions}
+
+    def _read(self, seq):
+        slot = seq % self.capacity
+        base = slot * self.n_fingers
+        fingers = tuple(
+            None if valor == MISSING else valor
+            for valor in self._fingers[base:base + self.n_fingers]
+        )
+        x = self._motion[2 * slot]
+        y = self._motion[2 * slot + 1]
+        device_seq = self._device[2 * slot]
+        device_time = self._device[2 * slot + 1]
+        return Frame(
+            seq,
+            self._timestamp[slot],
+            fingers,
+            None if x == MISSING else x,
+            None if y == MISSING else y,
+            None if device_seq == MISSING else device_seq,
+            None if device_time == MISSING else device_time,
+        )
+
+
+class FrameConsumer(threading.Thread):
+    """Executa um callback para cada frame entregue a uma Subscription."""
+
+    def __init__(self, subscription, callback):
+        super().__init__(name=f"frame-consumer-{subscription.name}", daemon=True)
+        self.subscription = subscription
+        self.callback = callback
+
+    def run(self):
+        while not self.subscription.closed:
+            for frame in self.subscription.wait(0.1):
+                try:
+                    self.callback(frame)
+                except Exception as e:
+                    print(f"Erro no consumidor '{self.subscription.name}': {e}")
+
+    def stop(self, timeout=1.0):
+        self.subscription.close()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
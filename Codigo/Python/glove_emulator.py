@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Emulador da luva num pseudo-terminal (Linux/macOS).
+
+Gera frames no mesmo formato do Arduino, com S e T, e permite injetar atraso,
+jitter, perdas e drift de relógio. Use o caminho impresso como porta COM no
+app, ou rode com --report para medir o próprio link com LinkStats (e
+--record para gravar a sessão, usada pelo evaluate_predictor.py).
+
+    python glove_emulator.py --delay-ms 3 --jitter-ms 2 --loss 0.02 --report 10
+"""
+
+import argparse
+import heapq
+import math
+import os
+import random
+import time
+import tty
+
+from frame_bus import FrameBus, parse_line
+from link_stats import LinkStats, WRAP
+from session_recorder import SessionRecorder
+
+
+def make_line(seq, t, device_us):
+    """Frame sintético: dedos e movimento variando suavemente com o tempo."""
+    dedos = [int(512 + 400 * math.sin(2 * math.pi * (0.2 + 0.05 * i) * t + i)) for i in range(5)]
+    vx = int(round(8 * math.sin(2 * math.pi * 0.5 * t)))
+    vy = int(round(6 * math.cos(2 * math.pi * 0.3 * t)))
+
+    campos = [f"D{i}:{valor}" for i, valor in enumerate(dedos)]
+    campos += [f"X:{vx}", f"Y:{vy}", f"S:{seq % WRAP}", f"T:{device_us % WRAP}"]
+    return " ".join(campos) + "\r\n"
+
+
+def emulate(fd, duration, interval=0.010, delay=0.0, jitter=0.0, loss=0.0, drift_ppm=0.0, on_sent=None):
+    """Escreve frames em fd por duration segundos.
+
+    O instante do Arduino segue o relógio local multiplicado por (1 + drift);
+    cada frame é enviado depois de delay + uniforme(0, jitter), sem reordenar.
+    """
+    start = time.monotonic()
+    pending = []
+    last_send = start
+    seq = 0
+    sent = lost = 0
+
+    while True:
+        sample_time = start + seq * interval
+        if sample_time - start > duration and not pending:
+            break
+
+        next_event = min(sample_time, pending[0][0]) if pending else sample_time
+        espera = next_event - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+
+        now = time.monotonic()
+        while pending and pending[0][0] <= now:
+            _, linha = heapq.heappop(pending)
+            os.write(fd, linha.encode())
+            sent += 1
+            if on_sent:
+                on_sent()
+
+        if now >= sample_time and sample_time - start <= duration:
+            if random.random() < loss:
+                lost += 1
+            else:
+                device_us = int((sample_time - start) * (1 + drift_ppm * 1e-6) * 1e6)
+                send_time = max(sample_time + delay + random.uniform(0, jitter), last_send)
+                last_send = send_time
+                heapq.heappush(pending, (send_time, make_line(seq, sample_time - start, device_us)))
+            seq += 1
+
+    return sent, lost
+
+
+def report(master, slave, args):
+    """Roda o emulador e lê o outro lado do pty, como o app faria."""
+    stats = LinkStats(interval_s=args.interval_ms / 1000)
+    bus = FrameBus()
+    subscription = bus.subscribe("report")
+    recorder = SessionRecorder(args.record) if args.record else None
+    finger_tags = [f"D{i}" for i in range(5)]
+    buffer = b""
+
+    def ler():
+        nonlocal buffer
+        buffer += os.read(slave, 4096)
+        while b"\n" in buffer:
+            linha, buffer = buffer.split(b"\n", 1)
+            fingers, x, y, device_seq, device_time = parse_line(linha.decode(errors="ignore"), finger_tags)
+            bus.publish(fingers, x, y, device_seq=device_seq, device_time=device_time)
+
+        for frame in subscription.poll():
+            stats.update(frame.device_seq, frame.device_time, frame.timestamp)
+            if recorder:
+                recorder(frame)
+
+    sent, lost = emulate(
+        master, args.report, args.interval_ms / 1000, args.delay_ms / 1000,
+        args.jitter_ms / 1000, args.loss, args.drift_ppm, on_sent=ler,
+    )
+    if recorder:
+        recorder.close()
+
+    snapshot = stats.snapshot()
+    print(f"Enviados: {sent}, descartados pelo emulador: {lost}")
+    for chave, valor in snapshot.items():
+        print(f"  {chave}: {valor:.3f}" if isinstance(valor, float) else f"  {chave}: {valor}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulador da GyroGlove em pseudo-terminal")
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="atraso fixo antes de enviar")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="atraso extra aleatório (uniforme)")
+    parser.add_argument("--loss", type=float, default=0.0, help="probabilidade de descartar um frame")
+    parser.add_argument("--drift-ppm", type=float, default=0.0, help="drift do relógio do Arduino em relação ao host (positivo = adiantado)")
+    parser.add_argument("--duration", type=float, default=3600.0)
+    parser.add_argument("--report", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="mede o próprio link por N segundos e imprime as estatísticas")
+    parser.add_argument("--record", default="", metavar="ARQUIVO",
+                        help="com --report, grava os frames recebidos em JSON lines")
+    args = parser.parse_args()
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+
+    try:
+        if args.report:
+            report(master, slave, args)
+        else:
+            print(f"Emulador em {os.ttyname(slave)} (Ctrl+C para parar)")
+            emulate(
+                master, args.duration, args.interval_ms / 1000, args.delay_ms / 1000,
+                args.jitter_ms / 1000, args.loss, args.drift_ppm,
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,39 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+from frame_bus import FrameBus, FrameConsumer, parse_line, POLICY_EVERY, POLICY_DECIMATE
+from link_stats import LinkStats, SequenceCheck, SEQ_DUPLICATE, SEQ_REJECTED
+from cursor_predictor import (
+    CursorPredictor, PREDICTOR_DEFAULTS, frame_interval, load_predictor_config, pipeline_latency,
+    prediction_horizon,
+)
+from session_recorder import SessionRecorder
 
-class CalibrationThread(QThread):
+
+class FrameProducerThread(QThread):
+    """Lê linhas da porta serial e publica cada frame no FrameBus.
+
+    O processamento fica nos consumidores registrados em setup_consumers,
+    cada um com seu próprio cursor e política de leitura.
+    """
     finger_values_updated = pyqtSignal(list)
+    link_stats_updated = pyqtSignal(dict)
+    ui_rate_hz = 30
+    link_stats_period = 1.0
+    connect_message = "Conectado na porta {com_port} a 115200 baud"
 
-    def __init__(self, com_port='COM9', configs=None):
+    def __init__(self, com_port='COM9', configs=None, bus=None):
         super().__init__()
         self.com_port = com_port
         self.configs = configs or self.load_default_configs()
+        self.bus = bus or FrameBus()
         self.running = False
         self.arduino = None
+        self.consumers = []
+        self.link_stats = LinkStats()
+        self.sequence = SequenceCheck(self.link_stats.interval_s)
+        self.last_link_emit = 0.0
+        self.finger_tags = [finger["name"] for finger in self.configs["fingers"]]
 
     def load_default_configs(self):
         return {
@@ -38,59 +61,103 @@ class CalibrationThread(QThread):
         try:
             self.arduino = serial.Serial(self.com_port, 115200, timeout=0.01)
             time.sleep(1)
-            print(f"Conectado na porta {self.com_port} a 115200 baud para calibração")
+            print(self.connect_message.format(com_port=self.com_port))
             return True
         except Exception as e:
             print(f"Erro ao conectar na porta {self.com_port}: {e}")
             return False
 
+    def add_consumer(self, name, callback, policy=POLICY_EVERY, rate_hz=None):
+        subscription = self.bus.subscribe(name, policy, rate_hz)
+        self.consumers.append(FrameConsumer(subscription, callback))
+
+    def setup_consumers(self):
+        self.add_consumer("ui", self.emit_finger_values, POLICY_DECIMATE, self.ui_rate_hz)
+        self.add_consumer("link", self.update_link_stats)
+
+    def stop_consumers(self):
+        for consumer in self.consumers:
+            stats = consumer.subscription.stats()
+            consumer.stop()
+            print(f"Consumidor '{consumer.subscription.name}': {stats['delivered']} entregues, "
+                  f"{stats['dropped']} perdidos, atraso máximo {stats['max_lag']} frames")
+        self.consumers = []
+
+    def on_started(self):
+        print("Lendo dados... (Clique em Parar para finalizar)")
+
+    def on_finished(self):
+        print("Desconectado")
+
     def run(self):
         if not self.connect_arduino():
             return
 
-        print("Modo de calibração iniciado - apenas lendo potenciômetros...")
-        print("(Clique em Parar Calibração para finalizar)")
-
         try:
+            self.setup_consumers()
+            for consumer in self.consumers:
+                consumer.start()
+
+            self.on_started()
+
             while self.running:
                 if self.arduino.in_waiting > 0:
                     try:
                         linha = self.arduino.readline().decode('utf-8', errors='ignore').strip()
                         if linha:
-                            self.read_finger_values(linha)
+                            self.publish_line(linha)
                     except UnicodeDecodeError:
                         # Ignorar linhas com erro de decodificação
                         continue
                 time.sleep(0.001)
 
         except Exception as e:
-            print(f"\nErro durante calibração: {e}")
+            print(f"\nErro durante execução: {e}")
         finally:
             if self.arduino:
                 self.arduino.close()
-            print("Calibração finalizada")
+            self.stop_consumers()
+            self.on_finished()
 
-    def read_finger_values(self, linha):
-        finger_names = ["indicador", "médio", "anelar", "polegar", "mindinho"]
+    def publish_line(self, linha):
+        fingers, x, y, device_seq, device_time = parse_line(linha, self.finger_tags)
+        if x is None or y is None:
+            # Linha incompleta (readline devolveu só parte): X e Y vêm depois dos dedos
+            return
+        if (device_seq is None) != (device_time is None):
+            # S sem T: a linha foi cortada no fim
+            self.link_stats.count_rejected()
+            return
+        if device_seq is not None:
+            # Mesma conferência do LinkStats, para que um S/T corrompido não
+            # chegue ao cursor nem às teclas
+            status = self.sequence.check(device_seq, device_time)[0]
+            if status == SEQ_REJECTED:
+                self.link_stats.count_rejected()
+                return
+            if status == SEQ_DUPLICATE:
+                return
+        self.bus.publish(fingers, x, y, device_seq=device_seq, device_time=device_time)
+
+    def emit_finger_values(self, frame):
         finger_values = [0, 0, 0, 0, 0]
         raw_values = [0, 0, 0, 0, 0]  # Valores brutos dos potenciômetros
         max_val = 1024
 
-        for i, finger_config in enumerate(self.configs["fingers"]):
-            finger_tag = f"{finger_config['name']}:"
-            name = finger_names[i]
-
-            if finger_tag in linha:
-                try:
-                    valor = int(linha.split(finger_tag)[1].split()[0])
-                    percentage = max(0, min(100, 100 - int((valor / max_val) * 100)))
-                    finger_values[i] = percentage
-                    raw_values[i] = valor
-                except (ValueError, IndexError):
-                    pass
+        for i, valor in enumerate(frame.fingers[:5]):
+            if valor is not None:
+                finger_values[i] = max(0, min(100, 100 - int((valor / max_val) * 100)))
+                raw_values[i] = valor
 
         self.finger_values_updated.emit([finger_values, raw_values])
 
+    def update_link_stats(self, frame):
+        self.link_stats.update(frame.device_seq, frame.device_time, frame.timestamp)
+
+        if frame.timestamp - self.last_link_emit >= self.link_stats_period:
+            self.last_link_emit = frame.timestamp
+            self.link_stats_updated.emit(self.link_stats.snapshot())
+
     def stop(self):
         self.running = False
         if self.arduino:
@@ -100,137 +167,110 @@ class CalibrationThread(QThread):
                 pass
 
 
-class ArduinoThread(QThread):
-    finger_values_updated = pyqtSignal(list)
-
-    def __init__(self, com_port='COM9', configs=None):
-        super().__init__()
-        self.com_port = com_port
-        self.configs = configs or self.load_default_configs()
-        self.running = False
-        self.arduino = None
-        self.pressed_keys = {}  # Dicionário para controlar teclas e repetição
+class CalibrationThread(FrameProducerThread):
+    connect_message = "Conectado na porta {com_port} a 115200 baud para calibração"
 
-    def load_default_configs(self):
-        return {
-            "com_port": "COM9",
-            "fingers": [
-                {"name": "D0", "key": "", "threshold": 630},
-                {"name": "D1", "key": "", "threshold": 480},
-                {"name": "D2", "key": "", "threshold": 480},
-                {"name": "D3", "key": "", "threshold": 480},
-                {"name": "D4", "key": "", "threshold": 600}
-            ]
-        }
+    def on_started(self):
+        print("Modo de calibração iniciado - apenas lendo potenciômetros...")
+        print("(Clique em Parar Calibração para finalizar)")
 
-    def connect_arduino(self):
-        try:
-            self.arduino = serial.Serial(self.com_port, 115200, timeout=0.01)
-            time.sleep(1)
-            print(f"Conectado na porta {self.com_port} a 115200 baud")
-            return True
-        except Exception as e:
-            print(f"Erro ao conectar na porta {self.com_port}: {e}")
-            return False
+    def on_finished(self):
+        print("Calibração finalizada")
 
-    def run(self):
-        if not self.connect_arduino():
-            return
 
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0
-        sensitivity = 0.8
+class ArduinoThread(FrameProducerThread):
+    sensitivity = 0.8
 
-        print("Lendo dados... (Clique em Parar para finalizar)")
+    def __init__(self, com_port='COM9', configs=None, bus=None):
+        super().__init__(com_port, configs, bus)
+        self.pressed_keys = {}  # Dicionário para controlar teclas e repetição
+        self.recorder = None
+        self.last_motion_frame = None
 
+        # Previsão do cursor (opcional), configurada em "predictor" no configs.glv
+        self.predictor_config = PREDICTOR_DEFAULTS
+        self.predictor = None
         try:
-            while self.running:
-                if self.arduino.in_waiting > 0:
-                    try:
-                        linha = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                        if linha and "X:" in linha:
-                            try:
-                                x_part = linha.split("X:")[1].split()[0]
-                                y_part = linha.split("Y:")[1].split()[0]
-
-                                sensor_x = int(x_part)
-                                sensor_y = int(y_part)
+            self.predictor_config = load_predictor_config(self.configs.get("predictor"))
+            if self.predictor_config["enabled"]:
+                self.predictor = CursorPredictor.from_config(self.predictor_config)
+        except ValueError as e:
+            print(f"Erro na configuração do preditor, previsão desativada: {e}")
 
-                                mouse_x = sensor_y * sensitivity
-                                mouse_y = -sensor_x * sensitivity
-
-                                if abs(sensor_x) > 0 or abs(sensor_y) > 0:
-                                    pyautogui.move(mouse_x, mouse_y)
+    def setup_consumers(self):
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0
 
-                            except (ValueError, IndexError):
-                                pass
+        super().setup_consumers()
+        self.add_consumer("cursor", self.move_cursor)
+        self.add_consumer("keys", self.detect_fingers)
 
-                            self.detect_fingers(linha)
-                    except UnicodeDecodeError:
-                        # Ignorar linhas com erro de decodificação
-                        continue
+        record_path = self.configs.get("record_session")
+        if record_path:
+            try:
+                self.recorder = SessionRecorder(record_path)
+                self.add_consumer("recorder", self.recorder)
+            except OSError as e:
+                print(f"Erro ao abrir arquivo de gravação '{record_path}': {e}")
+
+    def current_horizon(self):
+        interval_s = self.link_stats.interval_s
+        latency = pipeline_latency(interval_s, self.link_stats.mean_latency(), self.predictor_config)
+        return prediction_horizon(latency, interval_s, self.predictor_config)
+
+    def move_cursor(self, frame):
+        if frame.x is None or frame.y is None:
+            return
 
-                time.sleep(0.001)
+        mouse_x = frame.y * self.sensitivity
+        mouse_y = -frame.x * self.sensitivity
 
-        except Exception as e:
-            print(f"\nErro durante execução: {e}")
-        finally:
-            if self.arduino:
-                self.arduino.close()
-            print("Desconectado")
+        if self.predictor:
+            dt = frame_interval(self.last_motion_frame, frame, self.link_stats.interval_s)
+            self.last_motion_frame = frame
+            mouse_x, mouse_y = self.predictor.update(mouse_x, mouse_y, dt, self.current_horizon())
+            if mouse_x or mouse_y:
+                pyautogui.move(mouse_x, mouse_y)
+            return
 
-    def detect_fingers(self, linha):
-        finger_names = ["indicador", "médio", "anelar", "polegar", "mindinho"]
-        finger_values = [0, 0, 0, 0, 0]
-        raw_values = [0, 0, 0, 0, 0]  # Valores brutos dos potenciômetros
-        max_val = 1024
+        if abs(frame.x) > 0 or abs(frame.y) > 0:
+            pyautogui.move(mouse_x, mouse_y)
 
+    def detect_fingers(self, frame):
         for i, finger_config in enumerate(self.configs["fingers"]):
-            finger_tag = f"{finger_config['name']}:"
+            valor = frame.fingers[i] if i < len(frame.fingers) else None
+            if valor is None:
+                continue
+
             threshold = finger_config["threshold"]
             key = finger_config["key"]
-            name = finger_names[i]
-
-            if finger_tag in linha:
-                try:
-                    valor = int(linha.split(finger_tag)[1].split()[0])
-                    percentage = max(0, min(100, 100 - int((valor / max_val) * 100)))
-                    finger_values[i] = percentage
-                    raw_values[i] = valor
-
-                    if valor < threshold:
-                        # Manter tecla pressionada se configurada e repetir continuamente
-                        if key and key.strip():
-                            try:
-                                if key not in self.pressed_keys:
-                                    # Primeira vez pressionando a tecla
-                                    pyautogui.keyDown(key)
-                                    self.pressed_keys[key] = 0
-                                else:
-                                    # Repetir a tecla a cada 5 ciclos (~50ms)
-                                    self.pressed_keys[key] += 1
-                                    if self.pressed_keys[key] >= 5:
-                                        pyautogui.press(key)
-                                        self.pressed_keys[key] = 0
-                            except Exception as e:
-                                print(f"Erro ao pressionar tecla '{key}': {e}")
-                    else:
-                        # Soltar tecla quando dedo não for detectado
-                        if key and key in self.pressed_keys:
-                            try:
-                                pyautogui.keyUp(key)
-                                del self.pressed_keys[key]
-                            except Exception as e:
-                                print(f"Erro ao liberar tecla '{key}': {e}")
-
-                except (ValueError, IndexError):
-                    pass
 
-        self.finger_values_updated.emit([finger_values, raw_values])
+            if valor < threshold:
+                # Manter tecla pressionada se configurada e repetir continuamente
+                if key and key.strip():
+                    try:
+                        if key not in self.pressed_keys:
+                            # Primeira vez pressionando a tecla
+                            pyautogui.keyDown(key)
+                            self.pressed_keys[key] = 0
+                        else:
+                            # Repetir a tecla a cada 5 ciclos (~50ms)
+                            self.pressed_keys[key] += 1
+                            if self.pressed_keys[key] >= 5:
+                                pyautogui.press(key)
+                                self.pressed_keys[key] = 0
+                    except Exception as e:
+                        print(f"Erro ao pressionar tecla '{key}': {e}")
+            else:
+                # Soltar tecla quando dedo não for detectado
+                if key and key in self.pressed_keys:
+                    try:
+                        pyautogui.keyUp(key)
+                        del self.pressed_keys[key]
+                    except Exception as e:
+                        print(f"Erro ao liberar tecla '{key}': {e}")
 
-    def stop(self):
-        self.running = False
-        # Soltar todas as teclas pressionadas antes de parar
+    def release_keys(self):
         for key in list(self.pressed_keys.keys()):
             try:
                 pyautogui.keyUp(key)
@@ -238,11 +278,14 @@ class ArduinoThread(QThread):
                 pass
         self.pressed_keys.clear()
 
-        if self.arduino:
-            try:
-                self.arduino.close()
-            except:
-                pass
+    def stop_consumers(self):
+        super().stop_consumers()
+        # Soltar todas as teclas pressionadas depois que o consumidor parou
+        self.release_keys()
+
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
 
 
 class GyroGlovesWindow(QMainWindow):
@@ -250,6 +293,9 @@ class GyroGlovesWindow(QMainWindow):
         super().__init__()
         self.arduino_thread = None
         self.calibration_thread = None
+        # Barramento compartilhado: outros consumidores (gravação, exportação...)
+        # podem se inscrever aqui sem mexer no loop de leitura
+        self.frame_bus = FrameBus()
         self.configs = self.loadConfigs()
         self.setupUI()
         self.connectSignals()
@@ -413,6 +459,15 @@ class GyroGlovesWindow(QMainWindow):
         """)
         self.label_autor.setText("Gabriel Evangelista Massara")
 
+        # Qualidade do link serial (perdas, atraso e jitter)
+        self.label_link = QLabel(self.centralwidget)
+        self.label_link.setGeometry(QRect(170, 382, 220, 17))
+        self.label_link.setStyleSheet("""
+            color: rgb(206, 255, 92);
+            font: 8pt "MS Shell Dlg 2";
+        """)
+        self.label_link.setText("")
+
     def carregarImagem(self):
         image_path = "files/img/cat2.png"
         if os.path.exists(image_path):
@@ -533,6 +588,15 @@ class GyroGlovesWindow(QMainWindow):
                     if abs(current_value - value) > 2:
                         self.sliders[i].setValue(int(value))
 
+    def updateLinkStats(self, stats):
+        if not stats["received"]:
+            return
+        self.label_link.setText(
+            f"Perdas {stats['drop_rate'] * 100:.1f}% | "
+            f"Atraso {stats['latency_ms']:.1f} ms | "
+            f"Jitter {stats['jitter_ms']:.1f} ms"
+        )
+
     def onOkClicked(self, index):
         slider_value = self.sliders[index].value()
         finger_key = self.fingerInputs[index].text()
@@ -574,10 +638,11 @@ class GyroGlovesWindow(QMainWindow):
             com_port = self.lineEdit_com.text() or "COM9"
             print(f"Iniciando comunicação com Arduino na porta {com_port}...")
 
-            self.arduino_thread = ArduinoThread(com_port, self.configs)
+            self.arduino_thread = ArduinoThread(com_port, self.configs, self.frame_bus)
             self.arduino_thread.running = True
 
             self.arduino_thread.finger_values_updated.connect(self.updateSliders)
+            self.arduino_thread.link_stats_updated.connect(self.updateLinkStats)
 
             self.arduino_thread.start()
 
@@ -593,6 +658,7 @@ class GyroGlovesWindow(QMainWindow):
         if self.arduino_thread and self.arduino_thread.isRunning():
             try:
                 self.arduino_thread.finger_values_updated.disconnect(self.updateSliders)
+                self.arduino_thread.link_stats_updated.disconnect(self.updateLinkStats)
             except:
                 pass
 
@@ -613,10 +679,11 @@ class GyroGlovesWindow(QMainWindow):
             com_port = self.lineEdit_com.text() or "COM9"
             print(f"Iniciando calibração na porta {com_port}...")
 
-            self.calibration_thread = CalibrationThread(com_port, self.configs)
+            self.calibration_thread = CalibrationThread(com_port, self.configs, self.frame_bus)
             self.calibration_thread.running = True
 
             self.calibration_thread.finger_values_updated.connect(self.updateSliders)
+            self.calibration_thread.link_stats_updated.connect(self.updateLinkStats)
 
             self.calibration_thread.start()
 
@@ -633,6 +700,7 @@ class GyroGlovesWindow(QMainWindow):
         if self.calibration_thread and self.calibration_thread.isRunning():
             try:
                 self.calibration_thread.finger_values_updated.disconnect(self.updateSliders)
+                self.calibration_thread.link_stats_updated.disconnect(self.updateLinkStats)
             except:
                 pass
 
@@ -656,6 +724,7 @@ class GyroGlovesWindow(QMainWindow):
 
             try:
                 self.arduino_thread.finger_values_updated.disconnect(self.updateSliders)
+                self.arduino_thread.link_stats_updated.disconnect(self.updateLinkStats)
             except:
                 pass
 
@@ -671,6 +740,7 @@ class GyroGlovesWindow(QMainWindow):
 
             try:
                 self.calibration_thread.finger_values_updated.disconnect(self.updateSliders)
+                self.calibration_thread.link_stats_updated.disconnect(self.updateLinkStats)
             except:
                 pass
 
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import statistics
+from collections import deque
+
+
+WRAP = 2 ** 32  # micros() e o contador do Arduino são unsigned long
+
+
+class ClockSync:
+    """Estima offset e drift do relógio do Arduino em relação ao host.
+
+    Ajusta host = device + offset + drift * device por mínimos quadrados numa
+    janela deslizante e desloca a reta até o envelope inferior (o frame mais
+    rápido da janela), já que o atraso de transporte nunca é negativo.
+    """
+
+    def __init__(self, window=500, refit_every=25, min_span_s=1.0):
+        self.samples = deque(maxlen=window)
+        self.refit_every = refit_every
+        self.min_span_s = min_span_s  # Abaixo disso o drift não é confiável
+        self.offset = None
+        self.drift = 0.0
+        self._origin = None
+        self._since_fit = 0
+
+    def add(self, device_s, host_s):
+        if self._origin is None:
+            self._origin = device_s
+        self.samples.append((device_s - self._origin, host_s - device_s))
+
+        self._since_fit += 1
+        if self.offset is None or self._since_fit >= self.refit_every:
+            self.fit()
+
+    def fit(self):
+        n = len(self.samples)
+        if n == 0:
+            return
+
+        mean_x = sum(x for x, _ in self.samples) / n
+        mean_y = sum(y for _, y in self.samples) / n
+        sxx = sum((x - mean_x) ** 2 for x, _ in self.samples)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in self.samples)
+
+        span = self.samples[-1][0] - self.samples[0][0]
+        drift = sxy / sxx if sxx > 0 and span >= self.min_span_s else 0.0
+        intercept = mean_y - drift * mean_x
+        intercept += min(y - (intercept + drift * x) for x, y in self.samples)
+
+        self.offset = intercept
+        self.drift = drift
+        self._since_fit = 0
+
+    def to_host(self, device_s):
+        """Converte um instante do Arduino (s) para o relógio do host (s)."""
+        return device_s + self.offset + self.drift * (device_s - self._origin)
+
+
+SEQ_FIRST = "first"
+SEQ_OK = "ok"
+SEQ_DUPLICATE = "duplicate"
+SEQ_RESET = "reset"          # S e T voltaram: Arduino reiniciado
+SEQ_RESYNC = "resync"        # Muitas rejeições seguidas: nova referência
+SEQ_REJECTED = "rejected"    # S/T não batem com o último frame aceito
+
+
+class SequenceCheck:
+    """Confere S e T de cada frame contra o último frame aceito.
+
+    Uma linha truncada ou corrompida costuma ter S ou T menores que o real;
+    o frame só é aceito se T andou o esperado para S ter andado gap frames.
+    """
+
+    def __init__(self, interval_s=0.010, max_rejects=5):
+        self.interval_s = interval_s
+        self.max_rejects = max_rejects  # Rejeições seguidas antes de ressincronizar
+        self._consecutive_rejects = 0
+        self._last_seq = None
+        self._last_time = None
+
+    def check(self, device_seq, device_time):
+        """Retorna (status, gap, elapsed_s) e avança a referência se aceito."""
+        gap, elapsed = 0, 0.0
+        if self._last_seq is None:
+            status = SEQ_FIRST
+        else:
+            gap = (device_seq - self._last_seq) % WRAP
+            elapsed = ((device_time - self._last_time) % WRAP) / 1e6
+            seq_back = gap > WRAP // 2
+            time_back = elapsed > WRAP // 2 / 1e6
+
+            if gap == 0:
+                return SEQ_DUPLICATE, gap, elapsed
+            if seq_back and time_back:
+                status = SEQ_RESET
+            elif seq_back or not self.plausible(gap, elapsed):
+                self._consecutive_rejects += 1
+                if self._consecutive_rejects < self.max_rejects:
+                    return SEQ_REJECTED, gap, elapsed
+                status = SEQ_RESYNC
+            else:
+                status = SEQ_OK
+
+        self._consecutive_rejects = 0
+        self._last_seq = device_seq
+        self._last_time = device_time
+        return status, gap, elapsed
+
+    def plausible(self, gap, elapsed):
+        """T andou o esperado para S ter andado gap frames?"""
+        esperado = gap * self.interval_s
+        return abs(elapsed - esperado) <= 0.5 * self.interval_s + 0.01 * esperado
+
+
+class LinkStats:
+    """Perdas, jitter e atraso de transporte calculados a partir de S e T.
+
+    O atraso é medido em relação ao frame mais rápido da janela: atrasos
+    constantes do caminho (USB, driver) não aparecem, só o que passa disso.
+    Frames cujo S/T não batem com o último frame aceito (linha truncada ou
+    corrompida) são descartados antes de chegar ao ClockSync e contados em
+    "rejected", não em "lost": drop_rate só conta frames que não chegaram.
+    """
+
+    def __init__(self, interval_s=0.010, window=500, late_factor=2.0, max_rejects=5):
+        self.interval_s = interval_s
+        self.window = window
+        self.late_factor = late_factor
+        self.sequence = SequenceCheck(interval_s, max_rejects)
+        self.clock = ClockSync(window)
+        self.latencies = deque(maxlen=window)
+        self.intervals = deque(maxlen=window)  # Intervalos no relógio do Arduino
+
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+        self.resets = 0
+        self.rejected = 0
+        self._pending_rejects = 0  # Rejeitados desde o último frame aceito
+        self._device_s = 0.0  # Tempo do Arduino sem o estouro do micros()
+
+    def count_rejected(self):
+        """Registra um frame descartado antes de chegar aqui (ex.: pelo produtor)."""
+        self.rejected += 1
+        self._pending_rejects += 1
+
+    def update(self, device_seq, device_time, host_time):
+        """Registra um frame; retorna o atraso estimado em segundos ou None."""
+        if device_seq is None or device_time is None:
+            return None
+
+        status, gap, elapsed = self.sequence.check(device_seq, device_time)
+        if status == SEQ_DUPLICATE:
+            return None
+        if status == SEQ_REJECTED:
+            self.count_rejected()
+            return None
+
+        if status == SEQ_RESET:
+            self.resets += 1
+            self._restart_clock()
+        elif status == SEQ_RESYNC:
+            # Várias rejeições seguidas: a referência é que ficou errada
+            self._restart_clock()
+        elif status == SEQ_OK:
+            # Frames rejeitados também abrem buraco em S, mas chegaram
+            self.lost += max(0, gap - 1 - self._pending_rejects)
+            self._device_s += elapsed
+            self.intervals.append(elapsed / gap)
+
+        self._pending_rejects = 0
+        self.received += 1
+
+        self.clock.add(self._device_s, host_time)
+        latency = max(0.0, host_time - self.clock.to_host(self._device_s))
+        self.latencies.append(latency)
+        if latency > self.late_factor * self.interval_s:
+            self.late += 1
+        return latency
+
+    def _restart_clock(self):
+        self.clock = ClockSync(self.window)
+        self._device_s = 0.0
+
+    def mean_latency(self):
+        """Atraso médio da janela em segundos (0 sem dados)."""
+        latencies = list(self.latencies)
+        return sum(latencies) / len(latencies) if latencies else 0.0
+
+    def snapshot(self):
+        total = self.received + self.lost + self.rejected
+        latencies = sorted(self.latencies)
+        snapshot = {
+            "received": self.received,
+            "lost": self.lost,
+            "late": self.late,
+            "resets": self.resets,
+            "rejected": self.rejected,
+            "drop_rate": self.lost / total if total else 0.0,
+            "late_rate": self.late / self.received if self.received else 0.0,
+            "latency_ms": 0.0,
+            "latency_p95_ms": 0.0,
+            "latency_max_ms": 0.0,
+            "jitter_ms": 0.0,
+            "interval_jitter_ms": 0.0,
+            "clock_offset_ms": 0.0,
+            "clock_drift_ppm": 0.0,
+        }
+        if latencies:
+            snapshot["latency_ms"] = statistics.fmean(latencies) * 1000
+            snapshot["latency_p95_ms"] = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+            snapshot["latency_max_ms"] = latencies[-1] * 1000
+            snapshot["jitter_ms"] = statistics.pstdev(latencies) * 1000
+        if self.intervals:
+            snapshot["interval_jitter_ms"] = statistics.pstdev(self.intervals) * 1000
+        if self.clock.offset is not None:
+            snapshot["clock_offset_ms"] = self.clock.offset * 1000
+            # Convenção: drift do relógio do Arduino em relação ao host
+            # (positivo = Arduino adiantado). ClockSync ajusta o contrário.
+            snapshot["clock_drift_ppm"] = -self.clock.drift / (1 + self.clock.drift) * 1e6
+        return snapshot
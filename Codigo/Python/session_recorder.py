@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+from frame_bus import Frame
+
+
+class SessionRecorder:
+    """Consumidor do FrameBus que grava cada frame como uma linha JSON."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, frame):
+        self.file.write(json.dumps(frame._asdict()) + "\n")
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"Sessão gravada em {self.path}")
+
+
+def load_session(path):
+    """Lê uma sessão gravada pelo SessionRecorder como lista de Frames."""
+    frames = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                dados = json.loads(linha)
+                dados["fingers"] = tuple(dados["fingers"])
+                frames.append(Frame(**dados))
+    return frames